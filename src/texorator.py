@@ -23,8 +23,17 @@ import re          # Para expresiones regulares (limpieza de texto)
 import textwrap    # Para formatear texto de ayuda
 import threading   # Para ejecutar tareas pesadas (procesamiento de voz) en segundo plano
 import tempfile    # Para crear archivos temporales
+import shutil      # Para copiar archivos
 import signal      # Para enviar señales a procesos (pausar/reanudar audio)
 import webbrowser  # Para abrir enlaces web
+import json        # Para comunicarse con el proceso persistente de Piper
+import wave        # Para leer y escribir archivos de audio WAV
+import hashlib     # Para el hash estable del filtro de Bloom del diccionario
+import time        # Para medir el tiempo de inactividad del corrector gramatical
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from bisect import bisect_right
+from functools import lru_cache
 
 # Importaciones opcionales: La aplicación funciona sin ellas, pero con menos características.
 # Se comprueba si cada librería está instalada y se establece una bandera (flag).
@@ -46,10 +55,20 @@ except ImportError: EZODF_OK = False
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)) # Directorio donde se ejecuta el script
 APP_ICON_PATH = os.path.join(SCRIPT_DIR, "texorator_ventana.png") # Icono de la ventana
 HELP_FILE_PATH = os.path.join(SCRIPT_DIR, "ayuda.txt") # Archivo de texto de la ayuda
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "texorator") # Caché del usuario
+LOGO_CACHE_PATH = os.path.join(CACHE_DIR, "logo_250x70.png") # Logo ya redimensionado
 PIPER_DIR = os.path.join(SCRIPT_DIR, "piper") # Carpeta que contiene el motor Piper
 PIPER_EXECUTABLE = os.path.join(PIPER_DIR, "piper") # Ejecutable de Piper
 DEFAULT_PIPER_MODEL = os.path.join(PIPER_DIR, "models", "es_ES-davefx-medium.onnx") # Modelo de voz por defecto
 PIPER_SAMPLES_URL = "https://rhasspy.github.io/piper-samples/" # Enlace para descargar más voces
+PDF_PRELOAD_MIN_BYTES = 50 * 1024 * 1024 # Los PDF más grandes se leen a memoria de una vez antes de analizarlos
+MP3_QUALITY = "4" # Calidad VBR de LAME para exportar a MP3 (0 = máxima; 4 ≈ 165 kbps, suficiente para voz)
+MAX_CHARS = 200_000 # Límite de caracteres del área de texto (se comprueba al pegar y al cargar un archivo)
+AUDIO_BLOCK_BYTES = 64 * 1024 # Tamaño de los bloques de audio que se copian al archivo y al reproductor
+SEMANTIC_CHUNK_CHARS = 5000 # Tamaño aproximado de cada fragmento de texto que se envía a LanguageTool en paralelo
+SEMANTIC_IDLE_SHUTDOWN_MS = 60_000 # Tiempo sin uso tras el que se cierra el servidor de LanguageTool para liberar memoria
+# Ubicaciones habituales del diccionario Hunspell que usa Enchant para es_ES
+HUNSPELL_DIC_PATHS = ["/usr/share/hunspell/es_ES.dic", "/usr/share/myspell/es_ES.dic", "/usr/share/myspell/dicts/es_ES.dic"]
 
 # --- 3. VARIABLES GLOBALES ---
 # Variables que necesitan ser accesibles desde diferentes partes del programa.
@@ -61,6 +80,19 @@ TEMP_AUDIO_PATH = "temp_playback.wav" # Archivo temporal donde se guarda el audi
 spell_checker = None             # Objeto para la corrección ortográfica
 semantic_checker = None          # Objeto para la corrección gramatical
 piper_model_path = None          # Variable de Tkinter para la ruta del modelo Piper seleccionado
+piper_process = None             # Proceso persistente de Piper (mantiene el modelo cargado en memoria)
+piper_process_model = None       # Ruta del modelo con el que se inició piper_process
+piper_lock = threading.Lock()    # Evita que dos hilos usen el proceso de Piper a la vez
+piper_stop_pending = False       # Cerrar Piper al terminar la lectura en curso (el usuario ha cambiado de voz)
+check_after_id = None            # Revisión programada tras dejar de escribir
+piper_path_update_pending = False # Indica si ya hay una actualización de la ruta del modelo programada
+tts_thread = None                # Hilo de la síntesis en curso (daemon: no retrasa el cierre de la aplicación)
+app_closing = False              # Indica que la ventana se está cerrando: los hilos ya no deben usar la interfaz
+text_line_starts = None          # Posición de inicio de cada línea del área de texto (se recalcula tras cada cambio)
+suggestions_menu = None          # Menú contextual de sugerencias (se crea una vez y se rellena en cada click)
+default_menu = None              # Menú contextual de edición (Cortar, Copiar, Pegar...)
+file_loading = False             # Indica si se está cargando un archivo en segundo plano
+grammar_check_running = False    # Indica si hay una revisión completa ("Revisar Ortografía") en curso
 
 # Sistema de gestión de modelos de Piper
 # Diccionario para almacenar los modelos de Piper: {Nombre amigable: ruta_al_archivo.onnx}
@@ -70,30 +102,177 @@ if os.path.exists(DEFAULT_PIPER_MODEL):
 
 # --- 4. CLASES Y FUNCIONES DE CORRECCIÓN ORTOGRÁFICA Y GRAMATICAL ---
 
+# Expresión regular para encontrar palabras (se compila una sola vez al cargar el programa)
+_WORD_RE = re.compile(r"\b[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ]+\b")
+
+class _BloomDict:
+    """Filtro de Bloom con las palabras del diccionario Hunspell.
+
+    Responde en memoria si una palabra está en el diccionario, evitando la búsqueda en Enchant.
+    Si no está en el filtro hay que consultar a Enchant, porque las formas derivadas por afijos
+    no aparecen en el .dic. A cambio, el filtro admite falsos positivos: con 7 bits por palabra
+    y unas 250 000 entradas, aproximadamente 1 de cada 100 000 palabras inexistentes se da por
+    buena sin consultar a Enchant. El hash es fijo (BLAKE2), así que son siempre las mismas.
+    """
+    SIZE_BITS = 1 << 23 # 8 Mbit (1 MB)
+    MASK = SIZE_BITS - 1
+    HASHES = 7 # Bits por palabra
+
+    def __init__(self, dic_path):
+        self.bits = bytearray(self.SIZE_BITS >> 3)
+        # Un byte no válido en la codificación se sustituye por "�", de modo que esa entrada no coincide con ninguna palabra
+        with open(dic_path, encoding=self._dic_encoding(dic_path), errors="replace") as f:
+            next(f, None) # La primera línea indica el número de entradas
+            for line in f:
+                # Formato de cada línea: palabra/AFIJOS [datos morfológicos]
+                parts = line.split("/", 1)[0].split()
+                if parts: self._add(parts[0])
+
+    @staticmethod
+    def _dic_encoding(dic_path):
+        """Devuelve la codificación del .dic, indicada en la línea SET de su archivo .aff."""
+        try:
+            with open(os.path.splitext(dic_path)[0] + ".aff", encoding="latin-1") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) > 1 and parts[0] == "SET":
+                        return parts[1]
+        except OSError:
+            pass
+        return "ISO-8859-1" # Codificación por defecto de Hunspell (habitual en los diccionarios myspell)
+
+    def _positions(self, word):
+        """Devuelve las posiciones de bit de una palabra (doble hash a partir de un único BLAKE2)."""
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        h1 = int.from_bytes(digest[:4], "little")
+        h2 = int.from_bytes(digest[4:], "little") | 1
+        return [(h1 + i * h2) & self.MASK for i in range(self.HASHES)]
+
+    def _add(self, word):
+        for pos in self._positions(word):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, word):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(word))
+
+    @classmethod
+    def load(cls):
+        """Crea el filtro a partir del primer diccionario Hunspell encontrado, o devuelve None."""
+        for path in HUNSPELL_DIC_PATHS:
+            if os.path.exists(path):
+                try:
+                    return cls(path)
+                except (OSError, LookupError) as e: # LookupError: codificación desconocida en el .aff
+                    print(f"Error al leer el diccionario Hunspell: {e}")
+        return None
+
 class SpellChecker:
-    """Maneja la corrección ortográfica usando la librería PyEnchant."""
-    def __init__(self, text_widget):
+    """Maneja la corrección ortográfica usando la librería PyEnchant.
+
+    Si se indica visible_range (una función que devuelve los índices visibles del área de texto),
+    solo se revisan las líneas visibles; el resto se revisa al desplazarse hasta ellas.
+    """
+    def __init__(self, text_widget, visible_range=None):
         self.text_widget = text_widget
+        self.visible_range = visible_range
         self.dictionary = None
+        self._dirty_range = None # Rango de líneas (primera, última) pendiente de revisar
+        self._after_id = None    # Revisión diferida programada con after()
+        self._view_after_id = None # Revisión diferida tras desplazar o redimensionar el texto
+        self._line_count = 1     # Número de líneas en la última modificación
+        self._known = set()      # Palabras ya comprobadas como correctas
+        self._unknown = set()    # Palabras ya comprobadas como incorrectas
+        self._bloom = None       # Filtro de Bloom del diccionario (None hasta que termina de crearse)
         if not ENCHANT_OK: return # Si la librería no está, no hace nada
         try:
             if enchant.dict_exists("es_ES"):
                 self.dictionary = enchant.Dict("es_ES")
                 self.text_widget.tag_configure("error", foreground="red", underline=True)
+                # El filtro tarda en crearse (se lee todo el .dic): mientras tanto se consulta solo a Enchant
+                threading.Thread(target=self._load_bloom, daemon=True).start()
         except Exception as e:
             print(f"Error al inicializar Enchant: {e}")
 
-    def check(self):
-        """Revisa todo el texto y subraya los errores."""
+    def _load_bloom(self):
+        """Crea el filtro de Bloom del diccionario en segundo plano."""
+        self._bloom = _BloomDict.load()
+
+    def check(self, start_line=None, end_line=None):
+        """Revisa el texto entre dos líneas (por defecto, todo el texto o solo lo visible) y subraya los errores."""
         if not self.dictionary: return
-        self.text_widget.tag_remove("error", "1.0", tk.END) # Limpia errores anteriores
-        text = self.text_widget.get("1.0", tk.END)
-        # Busca todas las palabras en el texto
-        for match in re.finditer(r"\b[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ]+\b", text):
+        last_line = int(self.text_widget.index("end-1c").split(".")[0])
+        start_line = max(1, start_line or 1)
+        end_line = min(last_line, end_line or last_line)
+        if self.visible_range:
+            # Limita la revisión a las líneas que se ven en pantalla
+            first_visible, last_visible = (int(index.split(".")[0]) for index in self.visible_range())
+            start_line, end_line = max(start_line, first_visible), min(end_line, last_visible)
+        if start_line > end_line: return
+        start, end = f"{start_line}.0", f"{end_line}.end"
+        self.text_widget.tag_remove("error", start, end) # Limpia errores anteriores del rango
+        text = self.text_widget.get(start, end)
+        line_starts = build_line_starts(text)
+        ranges = [] # Pares de índices (inicio, fin) de las palabras incorrectas
+        # Busca todas las palabras en el rango
+        for match in _WORD_RE.finditer(text):
             word = match.group(0)
-            if not self.dictionary.check(word): # Si la palabra no está en el diccionario
-                # La marca como un error
-                self.text_widget.tag_add("error", f"1.0+{match.start()}c", f"1.0+{match.end()}c")
+            if not self.is_correct(word): # Si la palabra no está en el diccionario
+                ranges += [index_for_offset(line_starts, match.start(), start_line),
+                           index_for_offset(line_starts, match.end(), start_line)]
+        # Marca todos los errores con una sola llamada a Tk
+        if ranges:
+            self.text_widget.tag_add("error", *ranges)
+
+    def is_correct(self, word):
+        """Indica si una palabra es correcta, consultando a Enchant solo la primera vez."""
+        if word in self._known: return True
+        if word in self._unknown: return False
+        # El filtro de Bloom evita la llamada a Enchant para las palabras más comunes
+        bloom = self._bloom
+        if (bloom is not None and word in bloom) or self.dictionary.check(word):
+            self._known.add(word)
+            return True
+        self._unknown.add(word)
+        return False
+
+    def mark_dirty(self):
+        """Registra las líneas modificadas y programa su revisión con una espera de 300 ms."""
+        if not self.dictionary: return
+        line_count = int(self.text_widget.index("end-1c").split(".")[0])
+        cursor_line = int(self.text_widget.index(tk.INSERT).split(".")[0])
+        # Si se añadieron líneas (p. ej. al pegar), el cambio empieza antes del cursor
+        added_lines = max(0, line_count - self._line_count)
+        self._line_count = line_count
+        first, last = cursor_line - added_lines, cursor_line
+        if self._dirty_range:
+            first, last = min(first, self._dirty_range[0]), max(last, self._dirty_range[1])
+        self._dirty_range = (first, last)
+        # Agrupa las modificaciones seguidas en una sola revisión
+        if self._after_id:
+            self.text_widget.after_cancel(self._after_id)
+        self._after_id = self.text_widget.after(300, self.check_dirty)
+
+    def on_view_changed(self):
+        """Programa la revisión de las líneas visibles tras desplazar o redimensionar el texto (50 ms)."""
+        if not (self.dictionary and self.visible_range): return
+        if self._view_after_id:
+            self.text_widget.after_cancel(self._view_after_id)
+        self._view_after_id = self.text_widget.after(50, self._check_visible)
+
+    def _check_visible(self):
+        """Revisa las líneas que se ven en pantalla."""
+        self._view_after_id = None
+        self.check()
+
+    def check_dirty(self):
+        """Revisa solo las líneas marcadas como modificadas."""
+        if self._after_id:
+            self.text_widget.after_cancel(self._after_id)
+        self._after_id = None
+        if self._dirty_range:
+            first, last = self._dirty_range
+            self._dirty_range = None
+            self.check(first, last)
 
     def get_suggestions(self, word):
         """Devuelve una lista de sugerencias para una palabra."""
@@ -103,77 +282,302 @@ class SpellChecker:
         """Añade una palabra al diccionario personal del usuario."""
         if self.dictionary:
             self.dictionary.add_to_pwl(word)
+            self._unknown.clear() # La palabra añadida ya no debe figurar como error
             perform_silent_recheck() # Vuelve a revisar para quitar el subrayado
 
 class SemanticChecker:
-    """Maneja la corrección gramatical usando language-tool-python."""
+    """Maneja la corrección gramatical usando language-tool-python.
+
+    El servidor de LanguageTool (un proceso Java que ocupa cientos de MB) no se inicia hasta
+    la primera revisión, y se cierra si pasa un tiempo sin usarse. El arranque del servidor y
+    las revisiones se hacen en un hilo aparte para no congelar la interfaz.
+    """
     def __init__(self, text_widget):
         self.text_widget = text_widget
         self.tool = None
+        self._last_matches = []      # Resultado de la última revisión de LanguageTool
+        self._last_text = None       # Texto de la última revisión
+        self._text_changed = True    # Indica si el texto ha cambiado desde la última revisión
+        self._pool = None            # Hilos para revisar varios fragmentos a la vez
+        self._worker = ThreadPoolExecutor(max_workers=1) # Hilo para iniciar el servidor y revisar
+        self._checking = False       # Indica si hay una revisión en curso en segundo plano
+        self._on_done = []           # Funciones pendientes de llamar cuando termine la revisión
+        self._marks_shown = False    # Indica si hay errores gramaticales subrayados en el texto
+        self._tool_lock = threading.Lock() # Protege el arranque y el cierre del servidor
+        self._last_use = 0.0         # Momento (time.monotonic) del último uso de LanguageTool
+        self._shutdown_id = None     # Comprobación de inactividad programada con after()
+        self.available = LANGUAGETOOL_OK
         if not LANGUAGETOOL_OK: return
-        self.text_widget.tag_configure("error", foreground="red", underline=True)
-        # La inicialización de LanguageTool es lenta, así que se hace en un hilo separado
-        # para no congelar la interfaz de usuario.
-        threading.Thread(target=self._initialize_tool, daemon=True).start()
-
-    def _initialize_tool(self):
-        """Carga el modelo de lenguaje en segundo plano."""
-        try:
-            self.tool = language_tool_python.LanguageTool('es-ES')
-        except Exception as e:
-            print(f"Error al inicializar LanguageTool: {e}")
-            self.tool = None
+        # Etiqueta propia: así la revisión ortográfica de la zona visible no borra los errores gramaticales
+        self.text_widget.tag_configure("grammar_error", foreground="red", underline=True)
+
+    def _get_tool(self):
+        """Devuelve LanguageTool, iniciando su servidor si no está en marcha. Se llama desde el hilo secundario."""
+        with self._tool_lock:
+            if self.tool is None and self.available:
+                try:
+                    self.tool = language_tool_python.LanguageTool('es-ES')
+                except Exception as e:
+                    print(f"Error al inicializar LanguageTool: {e}")
+                    self.available = False
+            return self.tool
+
+    def _maybe_shutdown(self):
+        """Cierra el servidor de LanguageTool si lleva un tiempo sin usarse."""
+        self._shutdown_id = None
+        idle_ms = (time.monotonic() - self._last_use) * 1000
+        if self._checking or idle_ms < SEMANTIC_IDLE_SHUTDOWN_MS:
+            # Se ha usado hace poco o se está usando: vuelve a comprobarlo más tarde
+            self._shutdown_id = self.text_widget.after(int(max(SEMANTIC_IDLE_SHUTDOWN_MS - idle_ms, 1000)), self._maybe_shutdown)
+            return
+        with self._tool_lock:
+            if self.tool:
+                try:
+                    self.tool.close()
+                except Exception as e:
+                    print(f"Error al cerrar LanguageTool: {e}")
+                self.tool = None
+
+    def _check_text(self, text):
+        """Revisa el texto con LanguageTool, enviando los textos largos en fragmentos simultáneos.
+
+        El servidor de LanguageTool atiende varias peticiones a la vez, así que los fragmentos
+        (cortados en límites de párrafo) se revisan en paralelo y luego se ajustan sus posiciones.
+        """
+        tool = self._get_tool()
+        if not tool: return []
+        chunks = [] # Pares (posición inicial, fragmento)
+        start = 0
+        while start < len(text):
+            end = text.find("\n\n", start + SEMANTIC_CHUNK_CHARS)
+            end = len(text) if end == -1 else end + 2
+            chunks.append((start, text[start:end]))
+            start = end
+        if len(chunks) <= 1:
+            return tool.check(text)
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        matches = []
+        for (base, _), chunk_matches in zip(chunks, self._pool.map(tool.check, [chunk for _, chunk in chunks])):
+            for rule in chunk_matches:
+                rule.offset += base # Convierte la posición del fragmento en posición del texto completo
+            matches.extend(chunk_matches)
+        return matches
+
+    def is_running(self):
+        """Indica si el servidor de LanguageTool está iniciado."""
+        return self.tool is not None
+
+    def mark_dirty(self):
+        """Indica que el texto ha cambiado y que la última revisión ya no es válida."""
+        self._text_changed = True
+        # Con el servidor cerrado nadie actualizará los subrayados: se quitan para no dejar errores desfasados
+        if self._marks_shown and not self._checking and self.tool is None:
+            self.text_widget.tag_remove("grammar_error", "1.0", tk.END)
+            self._marks_shown = False
+
+    def needs_check(self):
+        """Indica si el texto ha cambiado desde la última revisión."""
+        return self._text_changed
+
+    def check(self, on_done=None, touch=True):
+        """Revisa la gramática en segundo plano y subraya los errores al terminar.
+
+        Si el servidor no está en marcha, se inicia también en segundo plano.
+        on_done se llama desde el hilo de Tk cuando los errores ya están marcados.
+        Con touch=False (revisiones automáticas) no se retrasa el cierre por inactividad del servidor.
+        """
+        if on_done: self._on_done.append(on_done)
+        if not self.available:
+            self._notify_done()
+            return
+        if touch: self._last_use = time.monotonic()
+        if self._checking: return # Al terminar la revisión en curso se comprueba si el texto ha cambiado
+        text = self.text_widget.get("1.0", tk.END)
+        self._text_changed = False
+        if text == self._last_text:
+            self._apply(text, self._last_matches) # El texto no ha cambiado: no hace falta llamar a LanguageTool
+            return
+        self._checking = True
+        self._worker.submit(self._check_in_background, text)
 
-    def check(self):
-        """Revisa la gramática del texto. Puede ser lento en textos largos."""
-        if not self.tool: return
+    def _check_in_background(self, text):
+        """Revisa el texto en el hilo secundario y devuelve el resultado al hilo de Tk."""
         try:
-            matches = self.tool.check(self.text_widget.get("1.0", tk.END))
-            for rule in matches:
-                # Subraya el error gramatical
-                self.text_widget.tag_add("error", f"1.0+{rule.offset}c", f"1.0+{rule.offset + rule.errorLength}c")
+            matches = self._check_text(text)
         except Exception as e:
             print(f"Error durante la revisión semántica: {e}")
+            matches = None
+        try:
+            self.text_widget.after(0, self._finish_check, text, matches)
+        except (RuntimeError, tk.TclError):
+            pass # La ventana ya se ha cerrado
+
+    def _finish_check(self, text, matches):
+        """Marca los errores encontrados, salvo que el texto haya cambiado durante la revisión."""
+        self._checking = False
+        if self.tool and self._shutdown_id is None:
+            self._shutdown_id = self.text_widget.after(SEMANTIC_IDLE_SHUTDOWN_MS, self._maybe_shutdown)
+        if self._text_changed:
+            self.check(touch=False) # Las posiciones ya no corresponden al texto actual: se revisa de nuevo
+        elif matches is None:
+            self._notify_done()
+        else:
+            self._apply(text, matches)
 
-    def get_suggestions_at_offset(self, offset):
-        """Obtiene sugerencias para un error en una posición específica del texto."""
-        if not self.tool: return None, []
-        text = self.text_widget.get("1.0", tk.END)
-        matches = self.tool.check(text)
+    def _apply(self, text, matches):
+        """Guarda el resultado de la revisión y subraya los errores."""
+        self._last_matches, self._last_text = matches, text
+        line_starts = build_line_starts(text)
+        ranges = []
         for rule in matches:
+            ranges += [index_for_offset(line_starts, rule.offset),
+                       index_for_offset(line_starts, rule.offset + rule.errorLength)]
+        # Sustituye los errores gramaticales anteriores y subraya todos los nuevos con una sola llamada a Tk
+        self.text_widget.tag_remove("grammar_error", "1.0", tk.END)
+        if ranges:
+            self.text_widget.tag_add("grammar_error", *ranges)
+        self._marks_shown = bool(ranges)
+        self._notify_done()
+
+    def _notify_done(self):
+        """Llama a las funciones que esperaban el final de la revisión."""
+        callbacks, self._on_done = self._on_done, []
+        for callback in callbacks:
+            callback()
+
+    def get_suggestions_at_offset(self, offset):
+        """Obtiene sugerencias para un error en una posición específica del texto.
+
+        Solo usa la última revisión: si el texto ha cambiado desde entonces, sus posiciones ya no son válidas.
+        """
+        if not self.available or self._text_changed or self._last_text is None: return None, []
+        for rule in self._last_matches:
             if rule.offset <= offset < (rule.offset + rule.errorLength):
-                return text[rule.offset: rule.offset + rule.errorLength], rule.replacements
+                return self._last_text[rule.offset: rule.offset + rule.errorLength], rule.replacements
         return None, []
 
 # --- Funciones Auxiliares para Corrección ---
 def perform_all_checks():
     """Función pública para iniciar una revisión completa (ortografía y gramática)."""
-    if not (spell_checker and spell_checker.dictionary) and not (semantic_checker and semantic_checker.tool):
+    global grammar_check_running
+    if not (spell_checker and spell_checker.dictionary) and not (semantic_checker and semantic_checker.available):
         messagebox.showwarning("Corrector no disponible", "Las librerías 'pyenchant' o 'language-tool-python' no están instaladas.")
         return
+    grammar_check_running = True
     show_progress_bar("Revisando ortografía y gramática...")
+    check_button.config(state=tk.DISABLED) # Evita lanzar otra revisión mientras termina esta
     window.update_idletasks() # Actualiza la UI para mostrar la barra de progreso
-    perform_silent_recheck()
-    hide_progress_bar()
-    messagebox.showinfo("Revisión Completa", "Se ha completado la revisión del texto.")
+    if spell_checker and spell_checker.dictionary:
+        spell_checker.check()
+
+    def on_done():
+        global grammar_check_running
+        grammar_check_running = False
+        hide_progress_bar()
+        # Si mientras tanto ha empezado una lectura, el botón sigue el estado de los demás botones de acción
+        check_button.config(state=str(read_button.cget("state")))
+        messagebox.showinfo("Revisión Completa", "Se ha completado la revisión del texto.")
+
+    if semantic_checker and semantic_checker.available:
+        semantic_checker.check(on_done=on_done) # LanguageTool revisa en segundo plano y avisa al terminar
+    else:
+        on_done()
 
 def perform_silent_recheck():
     """Realiza la revisión sin mostrar notificaciones, ideal para después de una corrección."""
     if spell_checker and spell_checker.dictionary:
         spell_checker.check()
-    if semantic_checker and semantic_checker.tool:
+    # Una corrección no debe arrancar el servidor de LanguageTool: solo se revisa si ya está en marcha
+    if semantic_checker and semantic_checker.is_running():
         semantic_checker.check()
 
+def build_line_starts(text):
+    """Devuelve la posición (en caracteres) en la que empieza cada línea del texto."""
+    return list(accumulate((len(line) + 1 for line in text.split("\n")), initial=0))
+
+def index_for_offset(line_starts, offset, first_line=1):
+    """Convierte una posición de carácter en un índice de Tk ("línea.columna") sin que Tk cuente caracteres."""
+    line = bisect_right(line_starts, offset) - 1
+    return f"{first_line + line}.{offset - line_starts[line]}"
+
+def offset_for_index(index):
+    """Convierte un índice de Tk ("línea.columna") en la posición del carácter desde el inicio del texto."""
+    global text_line_starts
+    if text_line_starts is None:
+        text_line_starts = build_line_starts(text_entry.get("1.0", "end-1c"))
+    line, column = map(int, text_entry.index(index).split("."))
+    return text_line_starts[line - 1] + column
+
+def schedule_checks(event=None):
+    """Agrupa las pulsaciones de teclas seguidas en una sola revisión, 80 ms después de la última."""
+    global check_after_id
+    if check_after_id:
+        window.after_cancel(check_after_id)
+    check_after_id = window.after(80, run_checks)
+
+def run_checks():
+    """Revisa las líneas modificadas y, si LanguageTool ya está en marcha, la gramática."""
+    global check_after_id
+    check_after_id = None
+    if spell_checker:
+        spell_checker.check_dirty()
+    # Escribir no debe arrancar el servidor de LanguageTool, que tarda varios segundos en iniciarse,
+    # ni mantenerlo abierto; las teclas que no cambian el texto (flechas, Mayús...) no revisan nada
+    if semantic_checker and semantic_checker.is_running() and semantic_checker.needs_check():
+        semantic_checker.check(touch=False)
+
+def visible_text_range():
+    """Devuelve los índices de la primera y la última posición visibles del área de texto."""
+    return text_entry.index("@0,0"), text_entry.index(f"@0,{text_entry.winfo_height()}")
+
+def on_text_scrolled(first, last):
+    """Actualiza la barra de desplazamiento y revisa la ortografía de la nueva zona visible."""
+    text_scrollbar.set(first, last)
+    if spell_checker:
+        spell_checker.on_view_changed()
+
+def on_text_modified(event):
+    """Se ejecuta cada vez que cambia el contenido del área de texto."""
+    global text_line_starts
+    if not text_entry.edit_modified(): return # Ignora el evento generado al reiniciar la bandera
+    text_line_starts = None # El mapa de líneas se reconstruirá cuando se necesite
+    if spell_checker:
+        spell_checker.mark_dirty() # Revisa solo las líneas que han cambiado
+    if semantic_checker:
+        semantic_checker.mark_dirty()
+    text_entry.edit_modified(False) # Reinicia la bandera para detectar el siguiente cambio
+
+def on_text_pasted(event):
+    """Comprueba el límite de caracteres cuando Tk ya ha insertado el texto pegado."""
+    window.after_idle(enforce_max_chars)
+
+def enforce_max_chars():
+    """Descarta el texto más antiguo si el área de texto supera MAX_CHARS caracteres."""
+    global text_line_starts
+    # Solo se cuenta al pegar: escribiendo a mano no se llega a superar el límite
+    excess = (text_entry.count("1.0", "end-1c", "chars") or (0,))[0] - MAX_CHARS
+    if excess <= 0: return
+    text_entry.delete("1.0", f"1.0+{excess}c")
+    text_line_starts = None
+    if spell_checker:
+        spell_checker.on_view_changed() # Todas las líneas se han desplazado
+    if semantic_checker:
+        semantic_checker.mark_dirty()
+    messagebox.showwarning("Texto demasiado largo",
+                           f"El texto supera el límite de {MAX_CHARS:,} caracteres.\nSe han eliminado los {excess:,} primeros caracteres.")
+
 # --- FUNCIONES DE MENÚ CONTEXTUAL (CLICK DERECHO) ---
 def show_context_menu(event):
     """Muestra un menú contextual al hacer click derecho."""
     global spell_checker, semantic_checker
     click_index = text_entry.index(f"@{event.x},{event.y}")
     
-    # Si el click fue sobre una palabra marcada como "error"
-    if "error" in text_entry.tag_names(click_index):
-        menu = tk.Menu(text_entry, tearoff=0)
-        offset = text_entry.count("1.0", click_index)[0]
+    # Si el click fue sobre una palabra marcada como error ortográfico o gramatical
+    if {"error", "grammar_error"}.intersection(text_entry.tag_names(click_index)):
+        menu = suggestions_menu
+        menu.delete(0, tk.END) # Se reutiliza el mismo menú: solo cambian las sugerencias
+        offset = offset_for_index(click_index)
 
         # Primero, busca errores gramaticales en esa posición
         original_semantic, suggestions_semantic = semantic_checker.get_suggestions_at_offset(offset)
@@ -187,7 +591,7 @@ def show_context_menu(event):
         word_end = text_entry.index(f"{click_index} wordend")
         word = text_entry.get(word_start, word_end)
 
-        if spell_checker and not spell_checker.dictionary.check(word):
+        if spell_checker and not spell_checker.is_correct(word):
             suggestions_spell = spell_checker.get_suggestions(word)
             if suggestions_spell:
                 for sugg in suggestions_spell[:8]:
@@ -197,7 +601,7 @@ def show_context_menu(event):
         
         # Si el menú tiene opciones, lo muestra
         if menu.index(tk.END) is not None:
-            menu.tk_popup(event.x_root, event.y_root)
+            popup_menu(menu, event)
         else:
             show_default_menu(event)
     else:
@@ -206,13 +610,25 @@ def show_context_menu(event):
 
 def show_default_menu(event):
     """Muestra el menú contextual estándar de edición."""
+    popup_menu(default_menu, event)
+
+def build_context_menus():
+    """Crea una sola vez los menús contextuales del área de texto."""
+    global suggestions_menu, default_menu
+    suggestions_menu = tk.Menu(text_entry, tearoff=0)
     default_menu = tk.Menu(text_entry, tearoff=0)
     default_menu.add_command(label="Cortar", command=lambda: text_entry.event_generate("<<Cut>>"))
     default_menu.add_command(label="Copiar", command=lambda: text_entry.event_generate("<<Copy>>"))
     default_menu.add_command(label="Pegar", command=lambda: text_entry.event_generate("<<Paste>>"))
     default_menu.add_separator()
     default_menu.add_command(label="Seleccionar todo", command=lambda: text_entry.tag_add("sel", "1.0", "end"))
-    default_menu.tk_popup(event.x_root, event.y_root)
+
+def popup_menu(menu, event):
+    """Abre un menú en la posición del ratón y libera el foco al cerrarlo."""
+    try:
+        menu.tk_popup(event.x_root, event.y_root)
+    finally:
+        menu.grab_release()
 
 def correct_text(click_index, original, suggestion):
     """Reemplaza la palabra o frase original con la sugerencia seleccionada."""
@@ -230,19 +646,130 @@ def add_to_dict_and_recheck(word):
         spell_checker.add_to_dictionary(word)
 
 # --- 5. LÓGICA DE PROCESAMIENTO DE VOZ Y ARCHIVOS ---
+# Caracteres que no admiten los motores TTS (se compila una sola vez al cargar el programa)
+_UNWANTED_CHARS_RE = re.compile(r'[^a-zA-Z0-9áéíóúÁÉÍÓÚñÑüÜ.,¿?¡! \n]')
+
 def clean_text(text):
     """Elimina caracteres no deseados del texto para evitar errores en los motores TTS."""
-    return re.sub(r'[^a-zA-Z0-9áéíóúÁÉÍÓÚñÑüÜ.,¿?¡! \n]', '', text)
-
-def process_text_to_wav(final_wav_output, on_success, on_failure):
-    """Función principal que convierte texto a un archivo WAV."""
+    return _UNWANTED_CHARS_RE.sub('', text)
+
+def get_piper(model_path):
+    """Devuelve el proceso persistente de Piper para un modelo, iniciándolo solo si es necesario."""
+    global piper_process, piper_process_model
+    if piper_process and piper_process.poll() is None and piper_process_model == model_path:
+        return piper_process
+    stop_piper() # El modelo ha cambiado o el proceso terminó: se reinicia
+    # Con --json-input, Piper lee una petición JSON por línea y responde con la ruta del WAV generado
+    piper_process = subprocess.Popen(
+        [PIPER_EXECUTABLE, "--model", model_path, "--json-input", "--quiet"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE # Tuberías binarias, sin capa de texto
+    )
+    piper_process_model = model_path
+    return piper_process
+
+def stop_piper():
+    """Cierra el proceso persistente de Piper, si existe."""
+    global piper_process, piper_process_model, piper_stop_pending
+    piper_stop_pending = False # El modelo anterior ya queda liberado
+    if piper_process and piper_process.poll() is None:
+        piper_process.terminate()
+        piper_process.wait()
+    piper_process = None
+    piper_process_model = None
+
+def synthesize_with_piper(model_path, text, wav_output):
+    """Convierte texto a un archivo WAV usando el proceso persistente de Piper."""
+    with piper_lock:
+        piper = get_piper(model_path)
+        # La petición se codifica una sola vez y se escribe de golpe en la tubería
+        request = (json.dumps({"text": text, "output_file": os.path.abspath(wav_output)}) + "\n").encode("utf-8")
+        try:
+            piper.stdin.write(request)
+            piper.stdin.flush()
+            result = piper.stdout.readline() # Piper escribe la ruta del archivo al terminar
+        except OSError:
+            result = b""
+        if not result:
+            # El proceso ha terminado de forma inesperada: se informa del error y se reinicia la próxima vez
+            stderr = piper.stderr.read().decode("utf-8", "replace") if piper.poll() is not None else ""
+            stop_piper()
+            raise subprocess.CalledProcessError(piper.returncode or 1, PIPER_EXECUTABLE, stderr=stderr)
+
+def split_sentences(text):
+    """Divide el texto en frases para poder reproducir la primera cuanto antes."""
+    return [sentence for sentence in re.split(r"(?<=[.?!])\s+|\n+", text) if sentence.strip()]
+
+@lru_cache(maxsize=2)
+def load_piper_config(model_path):
+    """Lee la configuración (.onnx.json) de un modelo de Piper y la guarda en memoria para los siguientes usos."""
+    with open(model_path + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+def get_piper_sample_rate(model_path):
+    """Devuelve la frecuencia de muestreo indicada en la configuración del modelo."""
+    try:
+        return load_piper_config(model_path)["audio"]["sample_rate"]
+    except (OSError, KeyError, ValueError):
+        return 22050 # Frecuencia de los modelos Piper de calidad media
+
+def stream_text_with_piper(model_path, full_text, wav_output, player, on_first_audio):
+    """Sintetiza el texto frase a frase y envía cada fragmento al reproductor en cuanto está listo.
+
+    El audio se guarda a la vez en wav_output para poder repetirlo o guardarlo después.
+    Devuelve True si ha llegado a enviarse algún fragmento al reproductor.
+    """
+    output = None
+    played = False # Solo se activa cuando el reproductor ha aceptado el primer fragmento
+    completed = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            chunk_path = os.path.join(tmp_dir, "frase.wav")
+            for sentence in split_sentences(full_text):
+                if stop_processing_flag.is_set(): break
+                synthesize_with_piper(model_path, sentence, chunk_path)
+                with wave.open(chunk_path, "rb") as chunk:
+                    first_chunk = output is None
+                    if first_chunk:
+                        output = wave.open(wav_output, "wb")
+                        output.setparams(chunk.getparams())
+                    # Se copia por bloques para no tener en memoria la frase entera
+                    block_frames = max(1, AUDIO_BLOCK_BYTES // (chunk.getsampwidth() * chunk.getnchannels()))
+                    while frames := chunk.readframes(block_frames):
+                        output.writeframesraw(frames) # La cabecera se completa al cerrar el archivo
+                        player.stdin.write(frames)
+                player.stdin.flush()
+                played = True
+                if first_chunk:
+                    window.after(0, on_first_audio, wav_output) # El audio ya está sonando
+            else:
+                completed = True
+    except BrokenPipeError:
+        pass # El usuario ha detenido la reproducción, o el reproductor no ha podido iniciarse
+    finally:
+        if output: output.close()
+        # Un audio incompleto no se conserva para repetir o guardar
+        if not completed:
+            try:
+                os.unlink(wav_output)
+            except FileNotFoundError:
+                pass # No llegó a generarse ninguna frase
+    return played
+
+def process_text_to_wav(final_wav_output, on_success, on_failure, player=None):
+    """Función principal que convierte texto a un archivo WAV.
+
+    Con Piper, el audio se envía al reproductor (player) a medida que se genera
+    y on_success se llama en cuanto empieza a sonar.
+    """
     global stop_processing_flag, piper_model_path
     stop_processing_flag.clear()
-    if os.path.exists(final_wav_output):
-        os.remove(final_wav_output)
+    try:
+        os.unlink(final_wav_output)
+    except FileNotFoundError:
+        pass
     
-    raw_text = text_entry.get("1.0", tk.END).strip()
-    full_text = clean_text(raw_text)
+    raw_text = text_entry.get("1.0", tk.END)
+    full_text = clean_text(raw_text).strip() # Tras la limpieza pueden quedar solo espacios
     if not full_text:
         messagebox.showwarning("Advertencia", "No hay texto para procesar.")
         window.after(0, on_failure)
@@ -257,11 +784,12 @@ def process_text_to_wav(final_wav_output, on_success, on_failure):
                 messagebox.showerror("Error de Modelo", "El modelo de Piper seleccionado no es válido o no se encuentra.")
                 window.after(0, on_failure)
                 return
-            # Ejecuta Piper como un subproceso
-            process = subprocess.run(
-                [PIPER_EXECUTABLE, "--model", model_to_use, "--output_file", final_wav_output],
-                input=full_text, text=True, check=True, capture_output=True
-            )
+            # Si no ha sonado nada y el usuario no lo ha detenido, la interfaz no debe quedarse esperando
+            if not stream_text_with_piper(model_to_use, full_text, final_wav_output, player, on_success) \
+                    and not stop_processing_flag.is_set():
+                messagebox.showerror("Error de Reproducción", "No se pudo reproducir el audio. Compruebe que el dispositivo de sonido no está ocupado.")
+                window.after(0, on_failure)
+            return
         # Lógica para Pico TTS o eSpeak
         else:
             selected_voice = voice_var.get()
@@ -271,14 +799,50 @@ def process_text_to_wav(final_wav_output, on_success, on_failure):
         # Llama a la función de éxito cuando termina
         window.after(0, on_success, final_wav_output)
     except Exception as e:
+        if app_closing: return # La ventana ya no existe: no hay a quién mostrar el error
         # Muestra un error si algo sale mal
         stderr = e.stderr if hasattr(e, 'stderr') else str(e)
         messagebox.showerror("Error de Procesamiento", f"Ocurrió un error con el motor de voz:\n\n{stderr}")
         window.after(0, on_failure)
 
-def start_processing_thread(on_success, on_failure):
+def synthesis_running():
+    """Indica si hay una síntesis de voz en curso."""
+    return tts_thread is not None and tts_thread.is_alive()
+
+def start_processing_thread(on_success, on_failure, player=None):
     """Inicia el procesamiento de voz en un hilo separado para no bloquear la GUI."""
-    threading.Thread(target=process_text_to_wav, args=(TEMP_AUDIO_PATH, on_success, on_failure), daemon=True).start()
+    global tts_thread
+    def worker():
+        try:
+            process_text_to_wav(TEMP_AUDIO_PATH, on_success, on_failure, player)
+        except Exception as e:
+            # Al cerrar la ventana, los errores se deben a que la interfaz y Piper ya no existen
+            if not app_closing:
+                print(f"Error inesperado durante la síntesis de voz: {e}")
+        finally:
+            # Al cerrar su entrada, el reproductor termina cuando acaba el audio recibido
+            if player:
+                try: player.stdin.close()
+                except OSError: pass
+            # Si se cambió de voz durante la lectura, se libera ahora el modelo anterior
+            if piper_stop_pending:
+                with piper_lock:
+                    stop_piper()
+    # speak_text no inicia otra síntesis mientras esta siga en marcha (ver synthesis_running)
+    tts_thread = threading.Thread(target=worker, daemon=True)
+    tts_thread.start()
+
+def preload_piper(model_path):
+    """Inicia Piper en segundo plano con el modelo indicado, para que la primera lectura no espere a cargarlo."""
+    def worker():
+        try:
+            with piper_lock:
+                get_piper(model_path)
+            get_piper_sample_rate(model_path) # Deja también la configuración del modelo en caché
+        except OSError as e:
+            print(f"No se pudo precargar la voz de Piper: {e}")
+    # Piper carga el modelo en su propio proceso, así que este hilo termina enseguida
+    threading.Thread(target=worker, daemon=True).start()
 
 # --- 6. FUNCIONES DE INTERFAZ DE USUARIO (BOTONES Y MENÚS) ---
 def speak_text():
@@ -286,14 +850,37 @@ def speak_text():
     if not text_entry.get("1.0", tk.END).strip():
         messagebox.showwarning("Advertencia", "No hay texto para leer.")
         return
+    # Si la síntesis anterior aún no ha terminado (p. ej. justo tras detenerla), no se acumulan tareas
+    if synthesis_running():
+        return
     update_ui_for_audio_state("processing")
     show_progress_bar("Procesando voz, por favor espere...")
+    if engine_var.get() == "Piper TTS (Alta Calidad)":
+        start_streaming_playback()
+        return
     # Inicia el hilo de procesamiento. Cuando termine, ejecutará una de las dos funciones lambda.
     start_processing_thread(
         lambda wav: (hide_progress_bar(), play_audio()), # En caso de éxito
         lambda: reset_ui_after_action()                 # En caso de fallo
     )
 
+def start_streaming_playback():
+    """Reproduce el audio de Piper mientras se genera, sin esperar a sintetizar todo el texto."""
+    global current_playback_process, audio_is_paused
+    rate = get_piper_sample_rate(piper_model_path.get())
+    player = subprocess.Popen(["/usr/bin/aplay", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(rate)], stdin=subprocess.PIPE)
+    current_playback_process = player
+    audio_is_paused = False
+
+    def on_first_audio(wav):
+        # Si el usuario ya ha detenido la reproducción, no cambia el estado de la UI
+        if current_playback_process is player:
+            hide_progress_bar()
+            update_ui_for_audio_state("playing")
+            check_playback_status()
+
+    start_processing_thread(on_first_audio, lambda: reset_ui_after_action(), player=player)
+
 def select_piper_model():
     """Abre un diálogo para que el usuario seleccione un nuevo modelo de voz de Piper."""
     global piper_models
@@ -302,21 +889,31 @@ def select_piper_model():
         filetypes=[("Modelos ONNX", "*.onnx")]
     )
     if filepath:
-        # Piper requiere un archivo .json con el mismo nombre que el .onnx
+        # Piper requiere un archivo .json con el mismo nombre que el .onnx. En lugar de comprobar
+        # primero si existe, se lee directamente: así se detecta también un .json dañado y la
+        # configuración queda en caché para la primera lectura con este modelo.
         json_path = filepath + ".json"
-        if os.path.exists(json_path):
-            model_name = os.path.basename(filepath).replace(".onnx", "")
-            if model_name in piper_models:
-                if not messagebox.askyesno("Sobrescribir Modelo", f"El modelo '{model_name}' ya existe.\n¿Desea sobrescribirlo con la nueva ruta?"):
-                    return
-            
-            piper_models[model_name] = filepath # Añade el modelo al diccionario
-            update_voice_options() # Actualiza el menú desplegable de voces
-            voice_var.set(model_name) # Selecciona el nuevo modelo
-            messagebox.showinfo("Modelo Cargado", f"Se ha añadido y seleccionado el modelo:\n{model_name}")
-        else:
+        load_piper_config.cache_clear() # Vuelve a leer la configuración por si el archivo ha cambiado
+        try:
+            load_piper_config(filepath)
+        except OSError:
             messagebox.showwarning("Falta Archivo de Configuración",
                                  f"No se encontró el archivo de configuración requerido:\n{os.path.basename(json_path)}\n\nAsegúrese de que ambos archivos (.onnx y .onnx.json) están en la misma carpeta.")
+            return
+        except ValueError:
+            messagebox.showwarning("Archivo de Configuración no Válido",
+                                 f"El archivo de configuración no es un JSON válido:\n{os.path.basename(json_path)}")
+            return
+
+        model_name = os.path.basename(filepath).replace(".onnx", "")
+        if model_name in piper_models:
+            if not messagebox.askyesno("Sobrescribir Modelo", f"El modelo '{model_name}' ya existe.\n¿Desea sobrescribirlo con la nueva ruta?"):
+                return
+
+        piper_models[model_name] = filepath # Añade el modelo al diccionario
+        update_voice_options() # Actualiza el menú desplegable de voces
+        voice_var.set(model_name) # Selecciona el nuevo modelo
+        messagebox.showinfo("Modelo Cargado", f"Se ha añadido y seleccionado el modelo:\n{model_name}")
 
 def update_voice_options(*args):
     """Actualiza la lista de voces en el menú desplegable según el motor TTS seleccionado."""
@@ -347,8 +944,17 @@ def update_voice_options(*args):
     if current_voice not in new_options:
         voice_var.set(new_options[0])
 
+def schedule_piper_model_path_update(*args):
+    """Agrupa los cambios seguidos de voz (p. ej. al cambiar de motor) en una sola actualización."""
+    global piper_path_update_pending
+    if piper_path_update_pending: return
+    piper_path_update_pending = True
+    window.after_idle(update_piper_model_path)
+
 def update_piper_model_path(*args):
     """Actualiza la variable que almacena la ruta al modelo Piper cada vez que cambia la selección de voz."""
+    global piper_path_update_pending
+    piper_path_update_pending = False
     selected_engine = engine_var.get()
     if selected_engine == "Piper TTS (Alta Calidad)":
         selected_voice_name = voice_var.get()
@@ -356,30 +962,91 @@ def update_piper_model_path(*args):
         if path:
             piper_model_path.set(path)
 
+def on_piper_model_changed(*args):
+    """Cierra el proceso de Piper del modelo anterior al seleccionar otro, para liberar su memoria."""
+    global piper_stop_pending
+    if piper_process_model in (None, piper_model_path.get()): return
+    # Una lectura en curso sigue con su voz hasta el final: el proceso se cierra cuando termina
+    if synthesis_running():
+        piper_stop_pending = True
+        return
+    with piper_lock:
+        stop_piper()
+
+def read_file_into_memory(filepath):
+    """Lee un archivo completo a memoria con lecturas secuenciales grandes."""
+    with open(filepath, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            # Avisa al sistema de que la lectura será secuencial para que lea por adelantado
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # Devuelve bytes y no bytearray: PyMuPDF copia entero cualquier bytearray que recibe
+        return f.read()
+
+def extract_pdf_text(filepath):
+    """Extrae el texto de un PDF página a página."""
+    # PyMuPDF no admite varios hilos, y repartir las páginas entre procesos obligaría a hacer fork
+    # de un proceso con hilos en marcha (Tk, síntesis, LanguageTool), que puede bloquearse.
+    if os.path.getsize(filepath) >= PDF_PRELOAD_MIN_BYTES:
+        # En los PDF grandes, una sola lectura secuencial evita las muchas lecturas pequeñas de MuPDF
+        doc = fitz.open(stream=read_file_into_memory(filepath), filetype="pdf")
+    else:
+        doc = fitz.open(filepath)
+    with doc:
+        return "".join(page.get_text() for page in doc)
+
+def _load_file_worker(filepath):
+    """Lee el texto de un archivo (.pdf, .docx, .odt). Se ejecuta en un hilo aparte."""
+    file_type = os.path.splitext(filepath)[1]
+    if file_type == ".pdf":
+        return extract_pdf_text(filepath)
+    elif file_type == ".docx":
+        doc = docx.Document(filepath)
+        return "\n".join([para.text for para in doc.paragraphs])
+    else: # .odt
+        doc = ezodf.opendoc(filepath)
+        return "\n".join(e.plaintext() for e in doc.body if hasattr(e, 'plaintext'))
+
 def load_file():
-    """Carga texto desde un archivo (.pdf, .docx, .odt)."""
+    """Carga texto desde un archivo (.pdf, .docx, .odt) sin bloquear la interfaz."""
+    global file_loading
     filepath = filedialog.askopenfilename(title="Seleccionar archivo", filetypes=[("Documentos Soportados", "*.pdf *.docx *.odt"), ("Todos los archivos", "*.*")])
     if not filepath: return
-    text = ""
     file_type = os.path.splitext(filepath)[1]
-    try:
-        if file_type == ".pdf" and FITZ_OK:
-            with fitz.open(filepath) as doc:
-                text = "".join(page.get_text() for page in doc)
-        elif file_type == ".docx" and DOCX_OK:
-            doc = docx.Document(filepath)
-            text = "\n".join([para.text for para in doc.paragraphs])
-        elif file_type == ".odt" and EZODF_OK:
-            doc = ezodf.opendoc(filepath)
-            text = "\n".join(e.plaintext() for e in doc.body if hasattr(e, 'plaintext'))
-        else:
-            messagebox.showwarning("Formato no soportado", f"Las librerías para '{file_type}' no están instaladas o el formato no es soportado.")
-            return
-        text_entry.delete("1.0", tk.END)
-        text_entry.insert("1.0", text)
-        messagebox.showinfo("Éxito", "Archivo cargado correctamente.")
-    except Exception as e:
-        messagebox.showerror("Error al leer archivo", f"No se pudo leer el archivo:\n{e}")
+    if not ((file_type == ".pdf" and FITZ_OK) or (file_type == ".docx" and DOCX_OK) or (file_type == ".odt" and EZODF_OK)):
+        messagebox.showwarning("Formato no soportado", f"Las librerías para '{file_type}' no están instaladas o el formato no es soportado.")
+        return
+    file_loading = True
+    load_button.config(state=tk.DISABLED)
+    show_progress_bar("Cargando archivo, por favor espere...")
+
+    def worker():
+        # La lectura se hace en segundo plano; el resultado se entrega al hilo de la interfaz
+        try:
+            text = _load_file_worker(filepath)
+            window.after(0, on_file_loaded, text, None)
+        except Exception as e:
+            window.after(0, on_file_loaded, None, e)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def on_file_loaded(text, error):
+    """Muestra en el área de texto el contenido leído por load_file."""
+    global file_loading
+    file_loading = False
+    hide_progress_bar()
+    load_button.config(state=tk.NORMAL)
+    if error:
+        messagebox.showerror("Error al leer archivo", f"No se pudo leer el archivo:\n{error}")
+        return
+    text_entry.delete("1.0", tk.END)
+    if len(text) > MAX_CHARS:
+        # Se conserva el principio del documento, que es lo primero que se va a escuchar
+        text_entry.insert("1.0", text[:MAX_CHARS])
+        messagebox.showwarning("Archivo demasiado largo",
+                               f"El archivo supera el límite de {MAX_CHARS:,} caracteres.\nSe han cargado solo los {MAX_CHARS:,} primeros.")
+        return
+    text_entry.insert("1.0", text)
+    messagebox.showinfo("Éxito", "Archivo cargado correctamente.")
 
 def save_edition():
     """Guarda el contenido del área de texto en un archivo .odt."""
@@ -456,16 +1123,24 @@ def pause_audio():
         audio_is_paused = True
         update_ui_for_audio_state("paused")
 
+def terminate_playback_process():
+    """Termina el proceso de reproducción actual, si existe, reanudándolo antes si está en pausa."""
+    global current_playback_process, audio_is_paused
+    if current_playback_process and current_playback_process.poll() is None:
+        if audio_is_paused:
+            os.kill(current_playback_process.pid, signal.SIGCONT) # Un proceso pausado no atiende la señal de terminar
+        current_playback_process.terminate()
+    current_playback_process = None
+    audio_is_paused = False
+
 def stop_action():
     """Detiene cualquier acción en curso (procesamiento de voz o reproducción de audio)."""
     global current_playback_process, stop_processing_flag, audio_is_paused
+    # Activa la bandera para detener la síntesis en curso (también la que se está reproduciendo a la vez)
+    stop_processing_flag.set()
     # Si hay un audio reproduciéndose, lo termina
     if current_playback_process and current_playback_process.poll() is None:
-        current_playback_process.terminate()
-        current_playback_process = None
-    # Si se está procesando texto a voz, activa la bandera para detenerlo
-    else:
-        stop_processing_flag.set()
+        terminate_playback_process()
     audio_is_paused = False
     update_ui_for_audio_state("stopped")
     hide_progress_bar()
@@ -484,11 +1159,11 @@ def save_audio():
     try:
         # Si el usuario elige .mp3, convierte el .wav temporal usando ffmpeg
         if output_path.endswith(".mp3"):
-            subprocess.run(["/usr/bin/ffmpeg", "-i", TEMP_AUDIO_PATH, "-q:a", "0", output_path, "-y"], check=True)
-        # Si no, simplemente copia el archivo .wav
+            # El audio de los motores ya es mono; se conserva su frecuencia original para no remuestrear
+            subprocess.run(["/usr/bin/ffmpeg", "-i", TEMP_AUDIO_PATH, "-codec:a", "libmp3lame", "-q:a", MP3_QUALITY, "-ac", "1", output_path, "-y"], check=True)
+        # Si no, simplemente copia el archivo .wav (en Linux, copyfile usa os.sendfile y la copia la hace el núcleo)
         else:
-            import shutil
-            shutil.copy(TEMP_AUDIO_PATH, output_path)
+            shutil.copyfile(TEMP_AUDIO_PATH, output_path)
         messagebox.showinfo("Éxito", f"Archivo guardado en:\n{output_path}")
     except Exception as e:
         messagebox.showerror("Error al Guardar", f"No se pudo guardar el archivo:\n{e}\n\nAsegúrate de tener 'ffmpeg' instalado para guardar en formato MP3.")
@@ -519,12 +1194,17 @@ def update_ui_for_audio_state(state):
         for btn in action_buttons + [pause_button]: btn.config(state=tk.DISABLED)
         play_button.config(state=tk.NORMAL)
         stop_button.config(state=tk.NORMAL)
-        save_button.config(state=tk.NORMAL)
+        # Mientras Piper sigue generando, el audio temporal está incompleto y no se puede guardar
+        if not synthesis_running(): save_button.config(state=tk.NORMAL)
     else: # Estado "stopped" o "idle" (inactivo)
         for btn in action_buttons: btn.config(state=tk.NORMAL)
+        # Una carga de archivo en curso sigue bloqueando el botón de cargar hasta que termine
+        if file_loading: load_button.config(state=tk.DISABLED)
+        # Lo mismo con la revisión completa: un segundo click añadiría otro aviso de "Revisión Completa"
+        if grammar_check_running: check_button.config(state=tk.DISABLED)
         for btn in play_buttons: btn.config(state=tk.DISABLED)
-        # Si existe un audio temporal, activa los botones de reproducir y guardar
-        if os.path.exists(TEMP_AUDIO_PATH):
+        # Si existe un audio temporal ya terminado, activa los botones de reproducir y guardar
+        if os.path.exists(TEMP_AUDIO_PATH) and not synthesis_running():
             play_button.config(state=tk.NORMAL)
             save_button.config(state=tk.NORMAL)
 
@@ -539,39 +1219,73 @@ def check_playback_status():
 
 def reset_ui_after_action():
     """Restaura la interfaz a su estado inicial después de una acción."""
-    global current_playback_process
     hide_progress_bar()
-    current_playback_process = None
+    # Un reproductor abandonado en pausa dejaría bloqueada la síntesis que le envía el audio
+    terminate_playback_process()
     update_ui_for_audio_state("idle")
 
 def on_closing():
     """Función que se ejecuta al cerrar la ventana para limpiar procesos."""
+    global app_closing
+    app_closing = True # A partir de aquí, la síntesis en curso no muestra errores ni actualiza la UI
     stop_action()
+    stop_piper()
     window.destroy()
 
+def toggle_word_wrap():
+    """Activa o desactiva el ajuste de línea; sin él, Tk no mide cada línea al pegar textos grandes."""
+    if word_wrap_var.get():
+        text_entry.configure(wrap=tk.WORD)
+        text_hscrollbar.grid_remove()
+    else:
+        text_entry.configure(wrap=tk.NONE)
+        text_hscrollbar.grid(row=1, column=0, sticky='ew')
+
 def show_progress_bar(message):
     """Muestra la barra de progreso con un mensaje."""
     progress_label.config(text=message)
     progress_frame.pack(pady=(5,0), fill='x', padx=10)
-    progress_bar.start(10)
+    progress_bar.start(50) # Un paso cada 50 ms basta para ver que la aplicación sigue trabajando
 
 def hide_progress_bar():
-    """Oculta y detiene la barra de progreso."""
+    """Oculta y detiene la barra de progreso, salvo que aún la necesite una carga o una revisión en curso."""
+    # La barra es compartida: si otra tarea sigue en marcha, se vuelve a mostrar su mensaje
+    if file_loading:
+        progress_label.config(text="Cargando archivo, por favor espere...")
+        return
+    if grammar_check_running:
+        progress_label.config(text="Revisando ortografía y gramática...")
+        return
     progress_bar.stop()
     progress_frame.pack_forget()
 
-def open_link(url):
-    """Abre una URL en el navegador web por defecto."""
-    webbrowser.open_new(url)
+def load_app_logo():
+    """Devuelve el logo redimensionado, usando una copia en caché para no redimensionarlo en cada inicio."""
+    try:
+        # La caché es válida si es más reciente que la imagen original
+        if os.path.getmtime(LOGO_CACHE_PATH) >= os.path.getmtime(APP_ICON_PATH):
+            return tk.PhotoImage(file=LOGO_CACHE_PATH)
+    except (OSError, tk.TclError):
+        pass # No hay caché válida: se vuelve a crear
+    logo = Image.open(APP_ICON_PATH).resize((250, 70), Image.Resampling.LANCZOS)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        logo.save(LOGO_CACHE_PATH, "PNG", optimize=True)
+    except OSError as e:
+        print(f"Advertencia: No se pudo guardar el logo en caché: {e}")
+    return ImageTk.PhotoImage(logo)
 
 # --- 8. CONSTRUCCIÓN DE LA INTERFAZ GRÁFICA (GUI) ---
 # Creación de la ventana principal
 window = tk.Tk()
+window.withdraw() # Se mantiene oculta mientras se construye, para mostrarla con una sola distribución final
 window.title("TexOrator v5.2")
 window.geometry("1400x800")
 
 # Las variables de Tkinter se inicializan DESPUÉS de crear la ventana principal.
 piper_model_path = tk.StringVar()
+# Todos los cambios de modelo pasan por esta variable; la etiqueta de la pestaña de modelos la muestra con textvariable
+piper_model_path.trace_add("write", on_piper_model_changed)
 
 # Carga del icono de la aplicación
 try:
@@ -590,6 +1304,7 @@ main_tab = ttk.Frame(notebook)
 models_tab = ttk.Frame(notebook)
 notebook.add(main_tab, text='Principal')
 notebook.add(models_tab, text='Gestionar Modelos Piper')
+notebook.tab(models_tab, state='hidden') # Oculta hasta que se pide desde el menú "Voces"
 
 # --- Pestaña Principal ---
 # Frame superior con los controles de motor de voz y carga de archivos
@@ -611,12 +1326,12 @@ tk.Label(left_frame, text="Voz:").pack(side=tk.LEFT, padx=(10,5))
 voice_var = tk.StringVar()
 voice_menu = tk.OptionMenu(left_frame, voice_var, "")
 voice_menu.pack(side=tk.LEFT)
-voice_var.trace_add("write", update_piper_model_path) # Llama a la función cuando la voz cambia
+voice_var.trace_add("write", schedule_piper_model_path_update) # Actualiza la ruta del modelo cuando la voz cambia
 
 # Logo (centro)
 if PILLOW_OK:
     try:
-        app_logo_ref = ImageTk.PhotoImage(Image.open(APP_ICON_PATH).resize((250, 70), Image.Resampling.LANCZOS))
+        app_logo_ref = load_app_logo()
         tk.Label(center_frame, image=app_logo_ref).pack()
     except Exception as e:
         print(f"Error al cargar logo: {e}")
@@ -633,8 +1348,19 @@ help_button.pack(side=tk.LEFT)
 
 # Área de texto principal
 tk.Label(main_tab, text="Escribe o carga un texto aquí:").pack()
-text_entry = scrolledtext.ScrolledText(main_tab, wrap=tk.WORD, width=70, height=20, font=("Arial", 11))
-text_entry.pack(pady=5, padx=10, expand=True, fill='both')
+word_wrap_var = tk.BooleanVar(value=True)
+tk.Checkbutton(main_tab, text="Envoltura de palabras", variable=word_wrap_var, command=toggle_word_wrap).pack(anchor='e', padx=10)
+# Text y barras de desplazamiento propias: la barra horizontal solo aparece al desactivar la envoltura
+text_frame = tk.Frame(main_tab)
+text_frame.pack(pady=5, padx=10, expand=True, fill='both')
+text_entry = tk.Text(text_frame, wrap=tk.WORD, width=70, height=20, font=("Arial", 11), undo=True, maxundo=200)
+text_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_entry.yview)
+text_hscrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=text_entry.xview)
+text_entry.configure(xscrollcommand=text_hscrollbar.set)
+text_entry.grid(row=0, column=0, sticky='nsew')
+text_scrollbar.grid(row=0, column=1, sticky='ns')
+text_frame.rowconfigure(0, weight=1)
+text_frame.columnconfigure(0, weight=1)
 
 # Frame para la barra de progreso (inicialmente oculto)
 progress_frame = tk.Frame(main_tab)
@@ -646,66 +1372,132 @@ progress_bar.pack(pady=5, fill='x', expand=True)
 # Frame para los botones de acción principales
 button_frame = tk.Frame(main_tab)
 button_frame.pack(pady=10)
-BTN_WIDTH_TEXT = 15; BTN_HEIGHT = 2; BTN_WIDTH_ICON = 5; ICON_FONT = ("Arial", 14)
-read_button = tk.Button(button_frame, text="Leer Texto", command=speak_text, width=BTN_WIDTH_TEXT, height=BTN_HEIGHT)
+BTN_WIDTH_TEXT = 15; BTN_PADDING = (4, 10); BTN_WIDTH_ICON = 5; ICON_FONT = ("Arial", 14)
+# Los botones comparten dos estilos ya configurados en lugar de repetir fuente y tamaño en cada uno
+button_style = ttk.Style()
+button_style.configure("Text.TButton", width=BTN_WIDTH_TEXT, padding=BTN_PADDING)
+button_style.configure("Icon.TButton", font=ICON_FONT, width=BTN_WIDTH_ICON, padding=BTN_PADDING)
+read_button = ttk.Button(button_frame, text="Leer Texto", command=speak_text, style="Text.TButton")
 read_button.pack(side=tk.LEFT, padx=(5, 20))
-play_button = tk.Button(button_frame, text="▶", font=ICON_FONT, command=play_audio, width=BTN_WIDTH_ICON, height=BTN_HEIGHT)
-play_button.pack(side=tk.LEFT, padx=2)
-pause_button = tk.Button(button_frame, text="⏸", font=ICON_FONT, command=pause_audio, width=BTN_WIDTH_ICON, height=BTN_HEIGHT)
-pause_button.pack(side=tk.LEFT, padx=2)
-stop_button = tk.Button(button_frame, text="⏹", font=ICON_FONT, command=stop_action, width=BTN_WIDTH_ICON, height=BTN_HEIGHT)
-stop_button.pack(side=tk.LEFT, padx=(2, 20))
-save_button = tk.Button(button_frame, text="Guardar Audio", command=save_audio, width=BTN_WIDTH_TEXT, height=BTN_HEIGHT)
+play_button = ttk.Button(button_frame, text="▶", command=play_audio, style="Icon.TButton")
+pause_button = ttk.Button(button_frame, text="⏸", command=pause_audio, style="Icon.TButton")
+stop_button = ttk.Button(button_frame, text="⏹", command=stop_action, style="Icon.TButton")
+# Los tres botones de reproducción se colocan con una sola llamada a Tcl
+window.tk.eval(f"pack {play_button} {pause_button} -side left -padx 2; pack {stop_button} -side left -padx {{2 20}}")
+save_button = ttk.Button(button_frame, text="Guardar Audio", command=save_audio, style="Text.TButton")
 save_button.pack(side=tk.LEFT, padx=5)
-clear_button = tk.Button(button_frame, text="Limpiar", command=clear_text_area, width=BTN_WIDTH_TEXT, height=BTN_HEIGHT)
+clear_button = ttk.Button(button_frame, text="Limpiar", command=clear_text_area, style="Text.TButton")
 clear_button.pack(side=tk.LEFT, padx=5)
+# La fila de botones no cambia de tamaño: se fija el calculado y Tk deja de recalcularlo con cada cambio de estado
+button_frame.update_idletasks()
+button_frame.configure(width=button_frame.winfo_reqwidth(), height=button_frame.winfo_reqheight())
+button_frame.pack_propagate(False)
 
 
 # --- Pestaña "Gestionar Modelos Piper" ---
-models_frame = tk.LabelFrame(models_tab, text="Configuración de Piper TTS", padx=20, pady=20)
-models_frame.pack(expand=True, fill='both', padx=20, pady=10)
-
-# Instrucciones para el usuario
-instructions_frame = tk.Frame(models_frame)
-instructions_frame.pack(fill='x', pady=(0, 20))
-tk.Label(instructions_frame, text="Cómo cargar un modelo de voz personalizado:", font=("Arial", 12, "bold")).pack(anchor='w')
-link_label = tk.Label(instructions_frame, text=PIPER_SAMPLES_URL, fg="blue", cursor="hand2")
-link_label.pack(anchor='w', pady=(5, 10))
-link_label.bind("<Button-1>", lambda e: open_link(PIPER_SAMPLES_URL))
-instructions_text = textwrap.dedent("""
-    1.  Haz clic en el enlace de arriba para ir al catálogo de voces de Piper.
-    2.  Elige la voz que quieras. Al pulsar 'Download', se abrirá la página del modelo.
-    3.  Descarga tanto el archivo .onnx como el archivo de configuración .onnx.json.
-    4.  Coloca ambos archivos descargados juntos en una nueva carpeta.
-    5.  Pulsa el botón 'Cargar nuevo modelo' de abajo y selecciona solo el archivo .onnx.
-        El archivo de configuración se detectará y cargará automáticamente.
-    6.  ¡Listo! El modelo aparecerá como una opción en el menú 'Voz' de la pestaña Principal.
-""")
-tk.Label(instructions_frame, text=instructions_text, justify=tk.LEFT, wraplength=800).pack(anchor='w')
-tk.Button(models_frame, text="Cargar nuevo modelo (.onnx)...", command=select_piper_model).pack(pady=10)
-tk.Label(models_frame, text="Ruta del modelo seleccionado actualmente:").pack(pady=(20, 5))
-current_model_label = tk.Label(models_frame, textvariable=piper_model_path, wraplength=700, foreground="blue", font=("Arial", 10))
-current_model_label.pack()
+# Su contenido se construye la primera vez que se abre la pestaña, para acelerar el inicio.
+models_tab_built = False
+
+def build_models_tab():
+    """Construye el contenido de la pestaña 'Gestionar Modelos Piper' (solo la primera vez)."""
+    global models_tab_built
+    if models_tab_built: return
+    models_tab_built = True
+
+    models_frame = tk.LabelFrame(models_tab, text="Configuración de Piper TTS", padx=20, pady=20)
+    models_frame.pack(expand=True, fill='both', padx=20, pady=10)
+
+    # Instrucciones para el usuario
+    instructions_frame = tk.Frame(models_frame)
+    instructions_frame.pack(fill='x', pady=(0, 20))
+    tk.Label(instructions_frame, text="Cómo cargar un modelo de voz personalizado:", font=("Arial", 12, "bold")).pack(anchor='w')
+    link_label = tk.Label(instructions_frame, text=PIPER_SAMPLES_URL, fg="blue", cursor="hand2")
+    link_label.pack(anchor='w', pady=(5, 10))
+    link_label.bind("<Button-1>", lambda e: webbrowser.open(PIPER_SAMPLES_URL, new=2)) # Abre el enlace en una pestaña nueva
+    instructions_text = textwrap.dedent("""
+        1.  Haz clic en el enlace de arriba para ir al catálogo de voces de Piper.
+        2.  Elige la voz que quieras. Al pulsar 'Download', se abrirá la página del modelo.
+        3.  Descarga tanto el archivo .onnx como el archivo de configuración .onnx.json.
+        4.  Coloca ambos archivos descargados juntos en una nueva carpeta.
+        5.  Pulsa el botón 'Cargar nuevo modelo' de abajo y selecciona solo el archivo .onnx.
+            El archivo de configuración se detectará y cargará automáticamente.
+        6.  ¡Listo! El modelo aparecerá como una opción en el menú 'Voz' de la pestaña Principal.
+    """)
+    # Un Text de solo lectura no vuelve a ajustar todo el texto cada vez que cambia el tamaño de la ventana
+    instructions_box = tk.Text(instructions_frame, height=8, width=90, wrap=tk.WORD, borderwidth=0, font="TkDefaultFont", # La misma fuente que una etiqueta
+                               highlightthickness=0, background=instructions_frame.cget("bg"))
+    instructions_box.insert("1.0", instructions_text.strip("\n"))
+    instructions_box.configure(state=tk.DISABLED)
+    instructions_box.pack(anchor='w')
+    # Su contenido no cambia: se fija el tamaño calculado (que depende de las fuentes y la escala de la pantalla)
+    # para que Tk no vuelva a medirlo cada vez que se redimensiona la ventana
+    instructions_frame.update_idletasks()
+    instructions_frame.configure(width=instructions_frame.winfo_reqwidth(), height=instructions_frame.winfo_reqheight())
+    instructions_frame.pack_propagate(False)
+    tk.Button(models_frame, text="Cargar nuevo modelo (.onnx)...", command=select_piper_model).pack(pady=10)
+    tk.Label(models_frame, text="Ruta del modelo seleccionado actualmente:").pack(pady=(20, 5))
+    current_model_label = tk.Label(models_frame, textvariable=piper_model_path, wraplength=700, foreground="blue", font=("Arial", 10))
+    current_model_label.pack()
+
+def on_tab_changed(event):
+    """Construye la pestaña de modelos cuando el usuario la abre por primera vez."""
+    if notebook.select() == str(models_tab):
+        build_models_tab()
+
+notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+def show_models_tab():
+    """Muestra y abre la pestaña de modelos, construyéndola si es la primera vez."""
+    build_models_tab()
+    notebook.tab(models_tab, state='normal')
+    notebook.select(models_tab)
+
+# Barra de menús
+menubar = tk.Menu(window)
+voices_menu = tk.Menu(menubar, tearoff=0)
+voices_menu.add_command(label="Gestionar Modelos", command=show_models_tab)
+menubar.add_cascade(label="Voces", menu=voices_menu)
+window.config(menu=menubar)
 
 # --- 9. INICIO DE LA APLICACIÓN ---
 if __name__ == "__main__":
     # Inicializa los correctores
-    spell_checker = SpellChecker(text_entry)
+    # La ortografía se revisa solo en la zona visible, así el coste no depende del tamaño del documento
+    spell_checker = SpellChecker(text_entry, visible_range=visible_text_range)
     semantic_checker = SemanticChecker(text_entry)
     
     # Asocia el menú contextual al click derecho en el área de texto
+    build_context_menus()
     text_entry.bind("<Button-3>", show_context_menu)
+    # Revisa la ortografía de forma incremental a medida que cambia el texto
+    text_entry.bind("<<Modified>>", on_text_modified)
+    # El límite de caracteres se comprueba al pegar (los archivos cargados se recortan en on_file_loaded)
+    text_entry.bind("<<Paste>>", on_text_pasted)
+    text_entry.bind("<<PasteSelection>>", on_text_pasted)
+    # Al dejar de escribir se revisa el texto una sola vez, en lugar de tras cada tecla
+    text_entry.bind("<KeyRelease>", schedule_checks)
+    # Tk avisa a la barra de desplazamiento cada vez que cambia la zona visible (rueda, arrastre, teclado o cambio de tamaño)
+    text_entry.configure(yscrollcommand=on_text_scrolled)
     
     # Configura el estado inicial de la UI
     update_voice_options()
     update_ui_for_audio_state("idle")
+    # Calcula la distribución de la interfaz ya completa y muestra la ventana
+    window.update_idletasks()
+    window.deiconify()
+
+    # Carga la voz de Piper seleccionada mientras el usuario todavía no ha pedido leer nada
+    default_model = piper_model_path.get() # Ya asignada por update_piper_model_path durante update_idletasks
+    if engine_var.get() == "Piper TTS (Alta Calidad)" and default_model and os.path.exists(PIPER_EXECUTABLE):
+        preload_piper(default_model)
     
     # Limpia el archivo de audio temporal de una sesión anterior, si existe
-    if os.path.exists(TEMP_AUDIO_PATH):
-        try:
-            os.remove(TEMP_AUDIO_PATH)
-        except OSError as e:
-            print(f"Error al eliminar el archivo temporal: {e}")
+    try:
+        os.unlink(TEMP_AUDIO_PATH)
+    except FileNotFoundError:
+        pass # No quedó audio de la sesión anterior
+    except OSError as e:
+        print(f"Error al eliminar el archivo temporal: {e}")
 
     # Inicia el bucle principal de la aplicación
     window.mainloop()